@@ -4,10 +4,44 @@
 
 import os
 import json
+import hashlib
+import mmap
+import pickle
+import functools
+import queue
 import shutil
 import threading
+
+# orjson 的解析/序列化在 C 层完成，大 descriptor/索引时明显快于标准库；缺省时退回 json
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj):
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+    def _dumps_compact(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj):
+        return (json.dumps(obj, ensure_ascii=False, indent=2) + "\n").encode('utf-8')
+
+    def _dumps_compact(obj):
+        # 紧凑分隔符对齐 orjson 的输出：WAL 行更短，也省一遍空格
+        return json.dumps(obj, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, asdict, field
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from tkinter import Tk, Toplevel, Frame, Label, Entry, Button, Listbox, Scrollbar, END, messagebox, StringVar, ttk
+from tkinter import Tk, Toplevel, Frame, Label, Entry, Button, Canvas, Listbox, Scrollbar, END, messagebox, StringVar, ttk
 from github_auth import GitHubManager
 
 # —— 常量与路径 —— #
@@ -16,37 +50,154 @@ DATA_DIR = BASE_DIR / "data"
 REPOS_DIR = DATA_DIR / "repos"
 REPOS_CONFIG = DATA_DIR / "repos.json"
 INDEX_FILE = DATA_DIR / "index.json"
+ETAGS_FILE = DATA_DIR / "etags.json"
 INSTALLED_FILE = DATA_DIR / "installed.json"
+INSTALLED_LOG = DATA_DIR / "installed.log"
+INSTALLED_PKL = DATA_DIR / "installed.pkl"
+INSTALLED_SHA = DATA_DIR / "installed.sha256"
 TMP_DIR = DATA_DIR / "tmp"
+BLOBS_DIR = DATA_DIR / "blobs"
+BLOBS_FILE = DATA_DIR / "blobs.json"
 
 WINDOWS_FONTS_DIR = Path("C:/Windows/Fonts")
+LOCAL_FONTS_DIR = Path(os.environ.get("LOCALAPPDATA", "")) / "Microsoft" / "Windows" / "Fonts"
+FONTS_REG_KEY = r"Software\Microsoft\Windows NT\CurrentVersion\Fonts"
 
 # —— 工具函数 —— #
+# 已建目录的进程内缓存：热路径上反复 mkdir(exist_ok=True) 每次都要 stat
+_MKDIR_CACHE = set()
+_MKDIR_LOCK = threading.Lock()
+
+def _ensure_dir(p):
+    if p in _MKDIR_CACHE:
+        return
+    p.mkdir(parents=True, exist_ok=True)
+    with _MKDIR_LOCK:
+        _MKDIR_CACHE.add(p)
+
 def ensure_dirs():
     for d in [DATA_DIR, REPOS_DIR, TMP_DIR]:
-        d.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(d)
 ensure_dirs()
 
 def load_json(path, default):
-    if path.exists():
+    # 直接读、失败再兜底：比先 exists() 再读少一次 stat，也没有检查/读取间的竞态
+    try:
+        return _loads(path.read_bytes())
+    except Exception:
+        return default
+
+def save_json(path, data):
+    _ensure_dir(path.parent)
+    payload = _dumps(data)
+    # 裸 fd 写临时文件并 fsync 后再 os.replace：
+    # 进程中途挂掉不会留下半截 JSON，掉电也不会替换成空文件
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    return payload
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _blake2b_file(path):
+    """mmap 分块喂给 BLAKE2b，避免 read() 的用户态拷贝，适合几十 MB 的字体文件。"""
+    h = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for off in range(0, len(mm), 1 << 20):
+                    h.update(mm[off:off + (1 << 20)])
+        except ValueError:
+            pass  # 空文件无法 mmap，哈希保持初始值即可
+    return h.hexdigest()
+
+def _dest_identical(src, dest):
+    """目标已存在且大小、内容哈希都一致时返回 True，调用方可跳过复制。"""
+    try:
+        return (dest.exists()
+                and dest.stat().st_size == os.stat(src).st_size
+                and _blake2b_file(dest) == _blake2b_file(src))
+    except OSError:
+        return False
+
+def _link_or_copy(src, dest):
+    try:
+        dest.unlink(missing_ok=True)
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+def save_installed(data):
+    """保存 installed.json 全量快照，同时写 pickle 旁路缓存和 sha256 校验文件。"""
+    # save_json 把序列化后的字节原样落盘，直接哈希内存里的 payload，
+    # 免去刚写完又读回一遍的往返
+    raw = save_json(INSTALLED_FILE, data)
+    try:
+        INSTALLED_SHA.write_text(hashlib.sha256(raw).hexdigest(), encoding='utf-8')
+        with open(INSTALLED_PKL, 'wb') as f:
+            pickle.dump(data, f, protocol=5)
+        # 全量快照落盘后 WAL 里的增量记录全部过期，顺手清空
+        INSTALLED_LOG.write_bytes(b"")
+    except Exception as e:
+        print(f"[warn] 写入 installed 缓存失败: {e}")
+
+def replay_installed_log(installed):
+    """把上次没来得及合并的 WAL 记录重放进 installed 字典（崩溃恢复）。"""
+    try:
+        raw = INSTALLED_LOG.read_bytes()
+    except OSError:
+        return installed
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
         try:
-            return json.loads(path.read_text(encoding='utf-8'))
+            entry = _loads(line)
         except Exception:
-            return default
-    return default
+            continue  # 崩溃时最后一行可能只写了一半
+        installed[entry["filename"]] = entry
+    return installed
 
-def save_json(path, data):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+def load_installed(default):
+    """
+    启动时优先走 pickle 缓存：mmap 方式对 installed.json 做 sha256 校验，
+    未变化则 pickle.load（比 JSON 解析快得多），任何不一致都退回 load_json。
+    """
+    try:
+        if INSTALLED_FILE.exists() and INSTALLED_PKL.exists() and INSTALLED_SHA.exists():
+            with open(INSTALLED_FILE, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    sha = hashlib.sha256(mm).hexdigest()
+            if sha == INSTALLED_SHA.read_text(encoding='utf-8').strip():
+                with open(INSTALLED_PKL, 'rb') as f:
+                    return pickle.load(f)
+    except Exception:
+        pass
+    return load_json(INSTALLED_FILE, default)
 
 # —— 仓库管理 —— #
 class RepoConfig:
     def __init__(self):
-        self.repos = load_json(REPOS_CONFIG, [])
+        # 内部按 key 存 dict：增删查都是 O(1)；磁盘上仍保存为条目列表
+        entries = load_json(REPOS_CONFIG, [])
+        self._repos = OrderedDict((r["key"], r) for r in entries)
+
+    @property
+    def repos(self):
+        return list(self._repos.values())
 
     def add_repo(self, owner, repo, descriptor="fonts.json"):
         key = f"{owner}/{repo}"
-        if any(r["key"] == key for r in self.repos):
+        if key in self._repos:
             raise ValueError("仓库已存在")
         entry = {
             "key": key,
@@ -55,84 +206,457 @@ class RepoConfig:
             "descriptor": descriptor,
             "enabled": True
         }
-        self.repos.append(entry)
+        self._repos[key] = entry
         self.save()
         return entry
 
     def remove_repo(self, key):
-        self.repos = [r for r in self.repos if r["key"] != key]
+        self._repos.pop(key, None)
         self.save()
 
     def save(self):
-        save_json(REPOS_CONFIG, self.repos)
+        save_json(REPOS_CONFIG, list(self._repos.values()))
 
 # —— 索引合并与同步 —— #
+# descriptor 拉取共用的线程池：跨刷新复用线程，不再每轮建池又拆池
+_FETCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="idx-fetch")
+
+@dataclass(slots=True)
+class FontMeta:
+    """单个字体的元数据。slots 实例比 7 键小 dict 省约一半内存，字段按偏移访问。"""
+    id: str
+    name: str = ""
+    family: str = ""
+    style: str = None
+    version: str = None
+    license: str = None
+    files: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, m, fid=""):
+        return cls(id=m.get("id") or fid,
+                   name=m.get("name", ""),
+                   family=m.get("family", ""),
+                   style=m.get("style"),
+                   version=m.get("version"),
+                   license=m.get("license"),
+                   files=m.get("files") or [])
+
+def _merge_descriptors(results):
+    """单趟桶式合并各仓库解析结果：按 fid 聚 sources，meta 首见生效。
+
+    合并是刷新里最热的纯 Python 循环，独立成模块级函数后全部状态都是
+    本地变量（LOAD_FAST 而非属性查找），也便于日后单独压测或替换实现。
+    """
+    merged_sources = defaultdict(list)
+    metas = {}
+    # 方法查找提到循环外，万级字体合并时省掉每次迭代的属性解析
+    sources_for = merged_sources.__getitem__
+    meta_first_wins = metas.setdefault
+    for items in results:
+        if items is None:
+            continue
+        for fid, meta, src in items:
+            sources_for(fid).append(src)
+            meta_first_wins(fid, meta)
+    # 直接迭代 items()，成型推导式里每个 fid 少查一次哈希
+    return {fid: {"meta": meta, "sources": merged_sources[fid]}
+            for fid, meta in metas.items()}
+
 class Indexer:
     def __init__(self, github_manager: GitHubManager):
         self.github = github_manager
         self.repo_cfg = RepoConfig()
-        self.index = load_json(INDEX_FILE, {})
+        # 磁盘上的 meta 是普通 dict，载入时转成 FontMeta
+        raw_index = load_json(INDEX_FILE, {})
+        self.index = {fid: {"meta": FontMeta.from_dict(info.get("meta", {}), fid),
+                            "sources": info.get("sources", [])}
+                      for fid, info in raw_index.items()}
+        self.etags = load_json(ETAGS_FILE, {})
         self.lock = threading.Lock()
+        # (repo_key, sha256) -> 已解析 descriptor 的 LRU，防止长期运行下缓存无界增长
+        self._parsed_descriptor_cache = OrderedDict()
+        self._desc_cache_lock = threading.Lock()
+        self._rebuild_search_rows()
+
+    DESC_CACHE_MAX = 128
+
+    def _rebuild_search_rows(self):
+        """随索引重建搜索/展示用的平行结构，搜索时免去逐行 .get()/.lower()。
+
+        所有结构都是先建好再整体换引用：UI 线程拿到的要么是上一代、
+        要么是新一代的完整对象，起到只读快照的作用。
+        """
+        search_keys = []
+        display_rows_by_fid = {}
+        trigrams = defaultdict(set)
+        for fid, info in self.index.items():
+            meta = info["meta"]
+            name = meta.name or fid
+            family = meta.family or ""
+            style = meta.style or ""
+            sources = len(info.get("sources", []))
+            # 名称/族名/样式拼成一条小写 haystack，查询时只做一次子串判断；
+            # 换行作分隔符，避免查询串跨字段边界误命中
+            name_lc = name.lower()
+            family_lc = family.lower()
+            style_lc = style.lower()
+            haystack = f"{name_lc}\n{family_lc}\n{style_lc}"
+            search_keys.append((haystack, fid))
+            display_rows_by_fid[fid] = (family, style, sources)
+            for text in (name_lc, family_lc, style_lc):
+                for i in range(len(text) - 2):
+                    trigrams[text[i:i + 3]].add(fid)
+        self._search_keys = search_keys
+        self._display_rows_by_fid = display_rows_by_fid
+        self._trigrams = trigrams
+
+    def search(self, q):
+        """返回命中小写查询串 q 的 fid 列表；q 需调用方先 lower()。"""
+        keys = self._search_keys
+        if not q:
+            return [fid for (_, fid) in keys]
+        # 查询够长时先用三元组倒排索引求候选交集，把逐行子串扫描压缩到候选集上
+        if len(q) >= 3:
+            trigrams = self._trigrams
+            cand = None
+            for i in range(len(q) - 2):
+                s = trigrams.get(q[i:i + 3])
+                if not s:
+                    return []
+                cand = set(s) if cand is None else cand & s
+                if not cand:
+                    return []
+            # 三元组命中只是必要条件，最后仍需真正的子串确认
+            return [fid for (haystack, fid) in keys
+                    if fid in cand and q in haystack]
+        return [fid for (haystack, fid) in keys if q in haystack]
+
+    def _fetch_one(self, r, token=None):
+        """下载并解析单个仓库的 descriptor，返回 (fid, meta, source) 列表（失败返回 None）。"""
+        owner, repo = r["owner"], r["repo"]
+        descriptor_path = r.get("descriptor", "fonts.json")
+        try:
+            tmp_desc = REPOS_DIR / f"{owner}_{repo}_descriptor.json"
+            etag_key = f"{owner}/{repo}/{descriptor_path}"
+            cached = self.etags.get(etag_key, {})
+            # 本地缓存文件还在时才发条件请求，命中 304 直接复用磁盘上的 descriptor
+            if tmp_desc.exists():
+                changed, etag, last_modified, sha, body = self.github.download_file_conditional(
+                    owner, repo, descriptor_path, str(tmp_desc),
+                    etag=cached.get("etag"), last_modified=cached.get("last_modified"),
+                    token=token)
+            else:
+                changed, etag, last_modified, sha, body = self.github.download_file_conditional(
+                    owner, repo, descriptor_path, str(tmp_desc), token=token)
+            if changed:
+                self.etags[etag_key] = {
+                    "etag": etag, "last_modified": last_modified, "sha256": sha}
+                self._any_changed = True
+            else:
+                sha = cached.get("sha256")
+            # 内容哈希没变就直接复用上次解析好的 descriptor，省掉 JSON 解析
+            cache_key = (r["key"], sha)
+            desc = None
+            if sha:
+                with self._desc_cache_lock:
+                    desc = self._parsed_descriptor_cache.get(cache_key)
+                    if desc is not None:
+                        self._parsed_descriptor_cache.move_to_end(cache_key)
+            if desc is None:
+                # 新正文直接在内存里解析，磁盘上的副本只作为重启后的持久缓存；
+                # 304 且解析缓存未命中时才需要回读磁盘
+                desc = _loads(body if body is not None else tmp_desc.read_bytes())
+                if sha:
+                    with self._desc_cache_lock:
+                        self._parsed_descriptor_cache[cache_key] = desc
+                        self._parsed_descriptor_cache.move_to_end(cache_key)
+                        while len(self._parsed_descriptor_cache) > self.DESC_CACHE_MAX:
+                            self._parsed_descriptor_cache.popitem(last=False)
+            repo_key = r["key"]
+            items = []
+            for f in desc.get("fonts", []):
+                # 每个字段只取一次；提取在工作线程里做，主线程只剩纯合并
+                family = f.get("family", "")
+                name = f.get("name", "")
+                # files 条目既可以是路径字符串，也可以是带可选 sha 的
+                # {"path": ..., "sha": ...}；内部统一成路径列表 + sha 映射
+                files = []
+                shas = {}
+                for entry in f.get("files", []):
+                    if isinstance(entry, dict):
+                        p = entry.get("path", "")
+                        if not p:
+                            continue
+                        files.append(p)
+                        if entry.get("sha"):
+                            shas[p] = entry["sha"]
+                    else:
+                        files.append(entry)
+                # 缺省 id 用 BLAKE2b 短哈希：不同 family/name 组合不会像
+                # 下划线拼接那样互相碰撞，且对显示名里的空格变化不敏感
+                fid = f.get("id") or hashlib.blake2b(
+                    f"{family}\x00{name}".encode(), digest_size=10).hexdigest()
+                meta = FontMeta(id=fid, name=name, family=family,
+                                style=f.get("style"), version=f.get("version"),
+                                license=f.get("license"), files=files)
+                src = {
+                    "repo_key": repo_key,
+                    "owner": owner,
+                    "repo": repo,
+                    "descriptor": descriptor_path,
+                    "files": files
+                }
+                if shas:
+                    src["shas"] = shas
+                items.append((fid, meta, src))
+            return items
+        except Exception as e:
+            print(f"[warn] fetch descriptor failed for {r['key']}: {e}")
+            return None
 
     def refresh_all(self):
-        new_index = {}
-        for r in list(self.repo_cfg.repos):
-            if not r.get("enabled", True):
-                continue
-            owner, repo = r["owner"], r["repo"]
-            descriptor_path = r.get("descriptor", "fonts.json")
-            try:
-                tmp_desc = REPOS_DIR / f"{owner}_{repo}_descriptor.json"
-                self.github.download_file(owner, repo, descriptor_path, str(tmp_desc))
-                desc = json.loads(tmp_desc.read_text(encoding='utf-8'))
-                fonts = desc.get("fonts", [])
-                for f in fonts:
-                    fid = f.get("id") or f"{f.get('family','')}_{f.get('name','')}".replace(" ", "_")
-                    meta = {
-                        "id": fid,
-                        "name": f.get("name"),
-                        "family": f.get("family"),
-                        "style": f.get("style"),
-                        "version": f.get("version"),
-                        "license": f.get("license"),
-                        "files": f.get("files", [])
-                    }
-                    entry = new_index.setdefault(fid, {"meta": meta, "sources": []})
-                    entry["sources"].append({
-                        "repo_key": r["key"],
-                        "owner": owner,
-                        "repo": repo,
-                        "descriptor": descriptor_path,
-                        "files": f.get("files", [])
-                    })
-            except Exception as e:
-                print(f"[warn] fetch descriptor failed for {r['key']}: {e}")
-                continue
+        repos = list(self.repo_cfg.repos)
+        enabled = [r for r in repos if r.get("enabled", True)]
+        self._any_changed = False
+        # 仓库被移除后它的 ETag 条目就成了死数据，顺手清掉避免缓存无限增长
+        valid_prefixes = {f"{r['owner']}/{r['repo']}/" for r in repos}
+        stale = [k for k in self.etags
+                 if not any(k.startswith(p) for p in valid_prefixes)]
+        for k in stale:
+            del self.etags[k]
+        # keyring 每次读取都是一趟系统调用，整轮刷新只取一次令牌传给各工作线程
+        token = self.github.github_auth.get_stored_token()
+        # 各仓库的 descriptor 拉取是纯网络等待，提交到常驻线程池并发执行；
+        # 按提交顺序收结果，保证 meta 首见合并的结果与仓库配置顺序一致
+        results = []
+        if enabled:
+            futures = [_FETCH_POOL.submit(self._fetch_one, r, token=token)
+                       for r in enabled]
+            results = [f.result() for f in futures]
+        new_index = _merge_descriptors(results)
+        # 全部仓库都 304 且合并结果没变：索引不用落盘，最多补存清理过的 ETag 缓存
+        if not self._any_changed and new_index == self.index:
+            if stale:
+                save_json(ETAGS_FILE, self.etags)
+            return self.index
         with self.lock:
             self.index = new_index
-            save_json(INDEX_FILE, self.index)
+            self._rebuild_search_rows()
+            # 仅落盘时把 FontMeta 展开回 dict，磁盘格式保持不变
+            save_json(INDEX_FILE, {
+                fid: {"meta": asdict(info["meta"]), "sources": info["sources"]}
+                for fid, info in new_index.items()})
+        save_json(ETAGS_FILE, self.etags)
         return self.index
 
     def get_index(self):
-        with self.lock:
-            return self.index
+        # 索引每次刷新都是整体替换，引用赋值本身原子，读侧无需拿锁
+        return self.index
+
+# —— Windows 字体安装 —— #
+# ctypes/winreg 只有真正安装字体时才需要，惰性加载让“打开-搜索-关闭”的常见路径更快启动
+@functools.cache
+def _gdi32():
+    import ctypes
+    from ctypes import wintypes
+    gdi32 = ctypes.windll.gdi32
+    # 声明固定原型，ctypes 走快速封送路径，批量安装时省掉每次调用的类型探测
+    gdi32.AddFontResourceExW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD,
+                                         ctypes.c_void_p]
+    gdi32.AddFontResourceExW.restype = ctypes.c_int
+    gdi32.RemoveFontResourceW.argtypes = [wintypes.LPCWSTR]
+    gdi32.RemoveFontResourceW.restype = wintypes.BOOL
+    return gdi32
+
+@functools.cache
+def _user32():
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    user32.SendMessageTimeoutW.argtypes = [
+        wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM,
+        wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)]
+    user32.SendMessageTimeoutW.restype = ctypes.c_ssize_t
+    return user32
+
+@functools.cache
+def _winreg():
+    import winreg
+    return winreg
+
+class WindowsFontInstaller:
+    """直接把字体安装到当前用户（HKCU 注册表 + AddFontResourceExW），无需管理员权限。"""
+
+    HWND_BROADCAST = 0xFFFF
+    WM_FONTCHANGE = 0x001D
+    SMTO_ABORTIFHUNG = 0x0002
+
+    @classmethod
+    def _broadcast_font_change(cls):
+        _user32().SendMessageTimeoutW(
+            cls.HWND_BROADCAST, cls.WM_FONTCHANGE, 0, 0,
+            cls.SMTO_ABORTIFHUNG, 1000, None)
+
+    @classmethod
+    def commit_font_changes(cls):
+        """批量安装/卸载完成后调用一次，通知系统字体列表已变化。"""
+        cls._broadcast_font_change()
+
+    @classmethod
+    def install_font_file_no_broadcast(cls, src, display_name):
+        """
+        安装单个字体文件但不发 WM_FONTCHANGE 广播。
+        逐个安装的调用方应在整批结束后调用一次 commit_font_changes()。
+        """
+        _ensure_dir(LOCAL_FONTS_DIR)
+        dest = LOCAL_FONTS_DIR / Path(src).name
+        # 重装同一字体时目标往往已经一字不差，比对哈希比重拷几十 MB 便宜得多
+        if not _dest_identical(src, dest):
+            try:
+                dest.unlink(missing_ok=True)
+                os.link(src, dest)
+            except OSError:
+                shutil.copyfile(src, dest)
+        winreg = _winreg()
+        with winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, FONTS_REG_KEY, 0,
+                                winreg.KEY_SET_VALUE) as key:
+            winreg.SetValueEx(key, display_name, 0, winreg.REG_SZ, str(dest))
+        _gdi32().AddFontResourceExW(str(dest), 0, 0)
+        return dest
+
+    @classmethod
+    def install_many(cls, pairs):
+        """
+        pairs: list[(src_path, display_name)]。
+        批量安装：复制全部文件、只打开一次注册表键、逐个 AddFontResourceExW，
+        最后只广播一次 WM_FONTCHANGE（广播每次会阻塞等待所有顶层窗口）。
+        """
+        _ensure_dir(LOCAL_FONTS_DIR)
+        installed = []
+        for src, display_name in pairs:
+            dest = LOCAL_FONTS_DIR / Path(src).name
+            # 同卷上硬链接是 O(1) 且共享数据块；失败（跨卷等）再退回纯数据拷贝。
+            # 字体安装不需要 copy2 那套时间戳/ACL 元数据同步。
+            # 目标与源内容一致（重装场景）时两者都免了。
+            if not _dest_identical(src, dest):
+                try:
+                    dest.unlink(missing_ok=True)
+                    os.link(src, dest)
+                except OSError:
+                    shutil.copyfile(src, dest)
+            installed.append((dest, display_name))
+        winreg = _winreg()
+        with winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, FONTS_REG_KEY, 0,
+                                winreg.KEY_SET_VALUE) as key:
+            for dest, display_name in installed:
+                winreg.SetValueEx(key, display_name, 0, winreg.REG_SZ, str(dest))
+        gdi32 = _gdi32()
+        for dest, _ in installed:
+            gdi32.AddFontResourceExW(str(dest), 0, 0)
+        cls.commit_font_changes()
+        return [dest for dest, _ in installed]
+
+    @classmethod
+    def uninstall_font_files(cls, names):
+        """
+        names: list[str]，LOCAL_FONTS_DIR 下的字体文件名。
+        批量卸载：注册表键只打开一次逐个删值，逐个 RemoveFontResourceW
+        并删除文件，最后只广播一次 WM_FONTCHANGE。
+        """
+        winreg = _winreg()
+        gdi32 = _gdi32()
+        removed = []
+        with winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, FONTS_REG_KEY, 0,
+                                winreg.KEY_SET_VALUE) as key:
+            for name in names:
+                path = LOCAL_FONTS_DIR / name
+                try:
+                    winreg.DeleteValue(key, Path(name).stem)
+                except OSError:
+                    pass  # 值可能是手动装的或早已删除
+                gdi32.RemoveFontResourceW(str(path))
+                try:
+                    path.unlink(missing_ok=True)
+                    removed.append(name)
+                except OSError as e:
+                    print(f"[warn] 删除字体文件失败 {name}: {e}")
+        cls.commit_font_changes()
+        return removed
 
 # —— 临时下载 / 引导安装 —— #
+# 字体文件下载的常驻线程池：批次间复用线程，省掉每个字体建/销一个池的开销
+_FILE_DL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="font-dl")
+
 class FontDownloader:
-    @staticmethod
-    def download_to_tmp(owner, repo, files, progress_callback=None):
-        tmp_files = []
-        TMP_DIR.mkdir(parents=True, exist_ok=True)
-        for i, f_rel in enumerate(files, start=1):
+    # 按内容寻址的字体文件缓存：blobs/<sha256>，映射关系存 blobs.json
+    _blob_map = None
+    _blob_lock = threading.Lock()
+
+    @classmethod
+    def _blobs(cls):
+        if cls._blob_map is None:
+            with cls._blob_lock:
+                if cls._blob_map is None:
+                    cls._blob_map = load_json(BLOBS_FILE, {})
+        return cls._blob_map
+
+    @classmethod
+    def download_to_tmp(cls, owner, repo, files, progress_callback=None, shas=None):
+        _ensure_dir(TMP_DIR)
+        github = GitHubManager.instance()
+        # 令牌整批只取一次；下载本身都走 github_auth 的模块级会话，
+        # TCP/TLS 连接在整批文件间复用，正文流式落盘
+        token = github.github_auth.get_stored_token()
+        blob_map = cls._blobs()
+        done_count = [0]
+        count_lock = threading.Lock()
+        cache_dirty = [False]
+
+        def _download_one(f_rel):
             filename = Path(f_rel).name
             save_path = TMP_DIR / filename
-            try:
-                GitHubManager().download_file(owner, repo, f_rel, str(save_path))
-            except Exception as e:
-                raise RuntimeError(f"下载 {f_rel} 失败: {e}")
-            tmp_files.append(save_path)
+            blob_key = f"{owner}/{repo}/{f_rel}"
+            # descriptor 声明的 sha 优先：内容寻址的缓存可以跨仓库命中同一文件
+            declared = shas.get(f_rel) if shas else None
+            sha = declared or blob_map.get(blob_key)
+            blob_path = BLOBS_DIR / sha if sha else None
+            cached = blob_path is not None and blob_path.exists()
+            if cached:
+                # 先把缓存副本落到 tmp；descriptor 声明过 sha 时缓存即权威，
+                # 到此为止零网络流量
+                _link_or_copy(blob_path, save_path)
+            if not (declared and cached):
+                # 没有声明 sha 的缓存只记录了首次下载时的内容，上游同路径
+                # 更新后会一直吃老本；凭本地副本带 If-None-Match 问一次
+                # 服务端，304 不传正文也不计配额，200 才算真有新内容
+                try:
+                    changed = github.download_file(owner, repo, f_rel,
+                                                   str(save_path), token=token)
+                except Exception as e:
+                    raise RuntimeError(f"下载 {f_rel} 失败: {e}")
+                if changed or sha is None:
+                    sha = _sha256_file(save_path)
+                if changed and declared and sha != declared:
+                    print(f"[warn] {f_rel} 的 sha256 与 descriptor 声明不符")
+                _ensure_dir(BLOBS_DIR)
+                blob_path = BLOBS_DIR / sha
+                if not blob_path.exists():
+                    _link_or_copy(save_path, blob_path)
+            if blob_map.get(blob_key) != sha:
+                with count_lock:
+                    blob_map[blob_key] = sha
+                    cache_dirty[0] = True
             if progress_callback:
-                progress_callback(i, len(files), filename)
+                with count_lock:
+                    done_count[0] += 1
+                    progress_callback(done_count[0], len(files), filename)
+            return save_path
+
+        # 同一字体的多个文件并发下载，总耗时从 sum(RTT) 降到 max(RTT)
+        tmp_files = list(_FILE_DL_POOL.map(_download_one, files))
+        if cache_dirty[0]:
+            save_json(BLOBS_FILE, blob_map)
         return tmp_files
 
     @staticmethod
@@ -152,8 +676,20 @@ class FontDownloader:
 
         Label(win, text="字体已下载到临时文件夹。\n请将文件拖拽到 C:\\Windows\\Fonts 完成安装。").pack(expand=True, pady=10)
 
+        def install_all():
+            files = [f for f in tmp_dir.iterdir() if f.is_file()]
+            if not files:
+                messagebox.showinfo("提示", "临时文件夹中没有字体文件")
+                return
+            try:
+                WindowsFontInstaller.install_many([(f, f.stem) for f in files])
+                messagebox.showinfo("提示", f"已安装 {len(files)} 个字体到当前用户")
+            except Exception as e:
+                messagebox.showerror("错误", f"安装失败: {e}")
+
         btn_frame = Frame(win)
         btn_frame.pack(pady=10)
+        Button(btn_frame, text="直接安装（当前用户）", command=install_all).pack(side="left", padx=6)
         Button(btn_frame, text="打开临时文件夹", command=lambda: FontDownloader.open_folder(tmp_dir)).pack(side="left", padx=6)
         Button(btn_frame, text="打开系统字体文件夹", command=lambda: FontDownloader.open_folder(WINDOWS_FONTS_DIR)).pack(side="left", padx=6)
         Button(btn_frame, text="清空临时文件夹", command=lambda: FontDownloader.clear_tmp_folder(tmp_dir)).pack(side="left", padx=6)
@@ -183,14 +719,23 @@ class FontDownloader:
 
         def confirm_uninstall():
             if gui_ref:
-                installed = gui_ref.installed
-                keys_to_remove = [k for k, v in installed.items() if v['filename'] in filenames]
-                for k in keys_to_remove:
-                    del installed[k]
-                save_json(INSTALLED_FILE, installed)
+                # set 探测 O(1)，一遍推导式重建字典，避开边遍历边删除
+                fn_set = set(filenames)
+                gui_ref.installed = {k: v for k, v in gui_ref.installed.items()
+                                     if v['filename'] not in fn_set}
+                save_installed(gui_ref.installed)
                 gui_ref.load_installed_list()
             win.destroy()
 
+        def uninstall_all():
+            try:
+                WindowsFontInstaller.uninstall_font_files(filenames)
+            except Exception as e:
+                messagebox.showerror("错误", f"卸载失败: {e}")
+                return
+            confirm_uninstall()
+
+        Button(btn_frame, text="直接卸载（当前用户）", command=uninstall_all).pack(side="left", padx=6)
         Button(btn_frame, text="我已卸载", command=confirm_uninstall).pack(side="left", padx=6)
 
         win.transient()
@@ -200,26 +745,126 @@ class FontDownloader:
     @staticmethod
     def clear_tmp_folder(tmp_dir: Path):
         if tmp_dir.exists():
-            for f in tmp_dir.iterdir():
-                try:
-                    if f.is_file():
-                        f.unlink()
-                    elif f.is_dir():
-                        shutil.rmtree(f)
-                except Exception as e:
-                    print(f"[warn] 清理临时文件失败: {e}")
+            # 整树递归删除后重建空目录：省掉逐条目 is_file/is_dir 的两次 stat。
+            # 注意直接 mkdir 而不是 _ensure_dir——目录在建目录缓存里，会被跳过
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True, exist_ok=True)
             messagebox.showinfo("提示", "临时文件夹已清空")
 
+# —— 虚拟化列表 —— #
+class VirtualList(Frame):
+    """
+    只绘制可视行的轻量列表。Treeview 为每行维护真实的 item，上万行时
+    插入和内存都是 O(N)；这里行数据只存在 Python 列表里，Canvas 上
+    每次仅画视口内的几十行，滚动时重画该切片。
+    """
+    ROW_H = 22
+    COL_X = (8, 360, 560)  # family / style / 来源数 三列的 x 偏移
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.canvas = Canvas(self, background="white", highlightthickness=0)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.scrollbar.pack(side="left", fill="y")
+        self.rows = []        # list[(fid, (family, style, sources))]
+        self.top = 0          # 第一个可见行的下标
+        self.selected = set() # 选中的行下标
+        self.canvas.bind("<Configure>", lambda e: self._redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Control-Button-1>", self._on_ctrl_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.top = 0
+        self.selected.clear()
+        self._redraw()
+
+    def selection(self):
+        """返回选中行的 fid 列表，与 Treeview.selection() 对齐。"""
+        return [self.rows[i][0] for i in sorted(self.selected) if i < len(self.rows)]
+
+    def _visible_count(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_H)
+
+    def _scroll_to(self, top):
+        self.top = max(0, min(top, max(0, len(self.rows) - self._visible_count())))
+        self._redraw()
+
+    def _on_scroll(self, action, value, units=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self.rows)))
+        elif action == "scroll":
+            step = self._visible_count() if units == "pages" else 1
+            self._scroll_to(self.top + int(value) * step)
+
+    def _on_wheel(self, event):
+        self._scroll_to(self.top - (event.delta // 120) * 3)
+
+    def _on_click(self, event):
+        idx = self.top + event.y // self.ROW_H
+        if idx < len(self.rows):
+            self.selected = {idx}
+            self._redraw()
+
+    def _on_ctrl_click(self, event):
+        idx = self.top + event.y // self.ROW_H
+        if idx < len(self.rows):
+            self.selected.symmetric_difference_update({idx})
+            self._redraw()
+
+    def _redraw(self):
+        c = self.canvas
+        c.delete("row")
+        total = len(self.rows)
+        visible = self._visible_count()
+        last = min(total, self.top + visible)
+        for i in range(self.top, last):
+            y = (i - self.top) * self.ROW_H
+            fid, (family, style, sources) = self.rows[i]
+            if i in self.selected:
+                c.create_rectangle(0, y, c.winfo_width(), y + self.ROW_H,
+                                   fill="#cce5ff", outline="", tags="row")
+            c.create_text(self.COL_X[0], y + self.ROW_H // 2, text=family, anchor="w", tags="row")
+            c.create_text(self.COL_X[1], y + self.ROW_H // 2, text=style, anchor="w", tags="row")
+            c.create_text(self.COL_X[2], y + self.ROW_H // 2, text=sources, anchor="w", tags="row")
+        if total:
+            self.scrollbar.set(self.top / total, last / total)
+        else:
+            self.scrollbar.set(0, 1)
+
 # —— GUI —— #
+# GUI 后台任务共用的线程池：复用线程省掉每次点击的创建开销，并天然限制并发数
+_BG_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fm-bg")
+
 class FontManagerGUI:
     def __init__(self, root: Tk):
         self.root = root
         self.root.title("Font Manager")
-        self.github = GitHubManager()
+        self.github = GitHubManager.instance()
         self.indexer = Indexer(self.github)
         self.repo_cfg = self.indexer.repo_cfg
-        self.installed = load_json(INSTALLED_FILE, {})
+        self.installed = replay_installed_log(load_installed({}))
+        self._tree_iids = set()
+        # 上次渲染用的行数据对象；换了新对象说明索引刷新过，整树需要重建
+        self._rows_by_fid_seen = None
+        # 工作线程不直接碰 Tk：把 (op, args) 投进队列，由主线程定时批量执行
+        self._ui_q = queue.Queue()
         self.setup_ui()
+        self.root.after(50, self._drain_ui_queue)
+
+    def _drain_ui_queue(self):
+        while True:
+            try:
+                op, args = self._ui_q.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                op(*args)
+            except Exception as e:
+                print(f"[warn] UI 更新失败: {e}")
+        self.root.after(50, self._drain_ui_queue)
         # self.refresh_index_threaded()  # 注释掉启动时自动刷新索引
 
     def setup_ui(self):
@@ -304,7 +949,11 @@ class FontManagerGUI:
         top.pack(fill="x")
         Label(top, text="搜索:").pack(side="left")
         self.search_var = StringVar()
-        Entry(top, textvariable=self.search_var).pack(side="left", fill="x", expand=True, padx=4)
+        search_entry = Entry(top, textvariable=self.search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=4)
+        # 监听变量写入而不是 KeyRelease：粘贴、输入法上屏、程序改值都能触发
+        self._search_after_id = None
+        self.search_var.trace_add("write", self._on_search_changed)
         Button(top, text="搜索", command=self.refresh_fonts_view).pack(side="left", padx=4)
         Button(top, text="刷新索引", command=self.refresh_index_threaded).pack(side="left", padx=4)
 
@@ -319,88 +968,201 @@ class FontManagerGUI:
         scrollbar = Scrollbar(middle, orient="vertical", command=self.fonts_tree.yview)
         scrollbar.pack(side="left", fill="y")
         self.fonts_tree.config(yscrollcommand=scrollbar.set)
+        self._fonts_scrollbar = scrollbar
+        # 行数超过阈值时换成虚拟化列表，避免 Treeview 上万 item 的插入/内存开销
+        self.fonts_vlist = VirtualList(middle)
+        self._virtual_mode = False
 
         bottom = Frame(frame)
         bottom.pack(fill="x")
         Button(bottom, text="下载并安装选中字体", command=self.on_download_selected).pack(side="left", padx=6)
         Button(bottom, text="刷新列表", command=self.refresh_fonts_view).pack(side="left", padx=6)
 
+    def _on_search_changed(self, *args):
+        # 尾沿防抖：一串连续击键只触发一次真正的刷新
+        if self._search_after_id:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(150, self._do_search_refresh)
+
+    def _do_search_refresh(self):
+        self._search_after_id = None
+        self.refresh_fonts_view()
+
+    VIRTUAL_ROWS_THRESHOLD = 2000
+
     def refresh_fonts_view(self):
-        idx = self.indexer.get_index()
         q = self.search_var.get().lower().strip()
-        for i in self.fonts_tree.get_children():
-            self.fonts_tree.delete(i)
-        for fid, info in idx.items():
-            name = info["meta"].get("name") or fid
-            family = info["meta"].get("family") or ""
-            style = info["meta"].get("style") or ""
-            sources = len(info.get("sources", []))
-            if q and q not in name.lower() and q not in family.lower():
-                continue
-            self.fonts_tree.insert("", END, iid=fid, values=(family, style, sources))
+        matched = self.indexer.search(q)
+        # 后台刷新可能正在换搜索结构：命中列表和行数据可能来自前后两代，
+        # 缺行的 fid 直接跳过，刷新完成后排队的那次重绘会补齐
+        rows_by_fid = self.indexer._display_rows_by_fid
+
+        # 命中行数太多时 Treeview 撑不住，切到只画可视区的虚拟化列表
+        if len(matched) > self.VIRTUAL_ROWS_THRESHOLD:
+            if not self._virtual_mode:
+                self.fonts_tree.pack_forget()
+                self._fonts_scrollbar.pack_forget()
+                self.fonts_vlist.pack(fill="both", expand=True, side="left")
+                self._virtual_mode = True
+            self.fonts_vlist.set_rows([(fid, rows_by_fid[fid])
+                                       for fid in matched if fid in rows_by_fid])
+            return
+        if self._virtual_mode:
+            self.fonts_vlist.pack_forget()
+            self.fonts_tree.pack(fill="both", expand=True, side="left")
+            self._fonts_scrollbar.pack(side="left", fill="y")
+            self._virtual_mode = False
+
+        # Treeview 路径维持增量增删。索引换代后留存行的 values 和顺序都可能
+        # 已经变了，先整树清空重建一次；平时键入过滤仍走增量路径
+        if rows_by_fid is not self._rows_by_fid_seen:
+            kids = self.fonts_tree.get_children()
+            if kids:
+                self.fonts_tree.delete(*kids)
+            self._tree_iids = set()
+            self._rows_by_fid_seen = rows_by_fid
+        want = set(matched)
+        to_del = self._tree_iids - want
+        to_add = want - self._tree_iids
+        if to_del:
+            self.fonts_tree.delete(*to_del)
+        if to_add:
+            # 绕过 insert() 包装的选项解析，直接走 Tcl 调用，大批量插入时开销减半
+            tree = self.fonts_tree
+            tk_call = tree.tk.call
+            w = tree._w
+            # 插入量大时先摘掉显示列，抑制逐行插入触发的重排/重绘，插完再挂回
+            detach = len(to_add) > 200
+            if detach:
+                tree.configure(displaycolumns=())
+            try:
+                # 按 matched 里的位置插入：留存行本就保持索引序（增量只删不换序），
+                # 新行落到对应下标后整棵树始终与索引顺序一致
+                for pos, fid in enumerate(matched):
+                    if fid not in to_add:
+                        continue
+                    row = rows_by_fid.get(fid)
+                    if row is None:
+                        continue
+                    tk_call(w, "insert", "", pos, "-id", fid, "-values", row)
+            finally:
+                if detach:
+                    tree.configure(displaycolumns=("family", "style", "sources"))
+        self._tree_iids = want
 
     def on_download_selected(self):
-        sel = self.fonts_tree.selection()
+        sel = self.fonts_vlist.selection() if self._virtual_mode else self.fonts_tree.selection()
         if not sel:
             messagebox.showinfo("提示", "请先选择字体")
             return
-        t = threading.Thread(target=self._download_fonts_thread, args=(sel,), daemon=True)
-        t.start()
+        _BG_POOL.submit(self._download_fonts_thread, sel)
+
+    def _append_installed_log(self, log_f, entry):
+        """把单条安装记录追加到 WAL 日志并落盘，崩溃时不丢已完成的安装。"""
+        line = _dumps_compact(entry) + b"\n"
+        log_f.write(line)
+        log_f.flush()
+        os.fsync(log_f.fileno())
 
     def _download_fonts_thread(self, fids):
-        for fid in fids:
-            info = self.indexer.get_index().get(fid)
-            if not info:
-                continue
-            sources = info.get("sources", [])
-            chosen = sources[0] if len(sources)==1 else self.ask_source_choice(sources)
-            if not chosen:
-                continue
-            owner = chosen["owner"]
-            repo = chosen["repo"]
-            files = chosen.get("files", [])
-            if not files:
-                continue
-
-            def callback(i, total, filename):
-                progress_var.set(f"正在下载 {i}/{total}: {filename}")
-                pb['value'] = i
-                progress_win.update_idletasks()
-
-            progress_win = Toplevel(self.root)
-            progress_win.title(f"下载字体 {info['meta'].get('name')}")
-            progress_win.geometry("400x120")
-            progress_win.transient(self.root)
-            progress_win.grab_set()
-            progress_var = StringVar()
-            Label(progress_win, text=f"正在下载字体 {info['meta'].get('name')}").pack(pady=6)
-            lbl = Label(progress_win, textvariable=progress_var)
-            lbl.pack(pady=4)
-            pb = ttk.Progressbar(progress_win, length=350, mode="determinate", maximum=len(files))
-            pb.pack(pady=6)
-            progress_win.update()
+        log_f = open(INSTALLED_LOG, "ab")
+        try:
+            self._download_fonts_batch(fids, log_f)
+        finally:
+            # 出异常也要关掉 WAL 句柄；已 fsync 的记录下次启动会被重放
+            log_f.close()
+        # WAL 还不大时安装只付追加成本，日志超过快照两倍体积才合并重写
+        try:
+            log_size = INSTALLED_LOG.stat().st_size
+        except OSError:
+            log_size = 0
+        try:
+            base_size = INSTALLED_FILE.stat().st_size
+        except OSError:
+            base_size = 0
+        if log_size > 2 * base_size:
+            save_installed(self.installed)
 
-            try:
-                tmp_files = FontDownloader.download_to_tmp(owner, repo, files, progress_callback=callback)
-            except Exception as e:
-                self._show_error("下载失败", str(e))
-                progress_win.destroy()
-                continue
+    def _make_progress_win(self, fut):
+        """在 Tk 主线程建好整批共用的进度窗，控件句柄经 Future 交回工作线程。"""
+        win = Toplevel(self.root)
+        win.title("下载字体")
+        win.geometry("400x120")
+        win.transient(self.root)
+        title_var = StringVar()
+        progress_var = StringVar()
+        Label(win, textvariable=title_var).pack(pady=6)
+        Label(win, textvariable=progress_var).pack(pady=4)
+        pb = ttk.Progressbar(win, length=350, mode="determinate")
+        pb.pack(pady=6)
+        fut.set_result((win, title_var, progress_var, pb))
 
-            pb['value'] = len(files)
-            progress_var.set("下载完成！")
-            progress_win.after(500, progress_win.destroy)
+    def _download_fonts_batch(self, fids, log_f):
+        # 进度窗整批只建一次：Tk 控件必须在主线程创建，工作线程等 Future 拿句柄
+        fut = Future()
+        self.root.after(0, self._make_progress_win, fut)
+        win, title_var, progress_var, pb = fut.result()
 
-            FontDownloader.show_install_instructions(TMP_DIR)
+        def callback(i, total, filename):
+            self._ui_q.put((progress_var.set, (f"正在下载 {i}/{total}: {filename}",)))
+            self._ui_q.put((pb.configure, ({'value': i},)))
 
-            for f in tmp_files:
-                self.installed[f.name] = {
-                    "filename": f.name,
-                    "source": chosen["repo_key"],
-                    "id": info['meta']['id']
-                }
-            save_json(INSTALLED_FILE, self.installed)
-            self.root.after(0, self.load_installed_list)
+        try:
+            for fid in fids:
+                info = self.indexer.get_index().get(fid)
+                if not info:
+                    continue
+                sources = info.get("sources", [])
+                chosen = sources[0] if len(sources)==1 else self.ask_source_choice(sources)
+                if not chosen:
+                    continue
+                owner = chosen["owner"]
+                repo = chosen["repo"]
+                files = chosen.get("files", [])
+                if not files:
+                    continue
+
+                # 换字体只重置文案和量程，不再重建窗口
+                self._ui_q.put((title_var.set, (f"正在下载字体 {info['meta'].name}",)))
+                self._ui_q.put((pb.configure, ({'maximum': len(files), 'value': 0},)))
+
+                try:
+                    tmp_files = FontDownloader.download_to_tmp(
+                        owner, repo, files, progress_callback=callback,
+                        shas=chosen.get("shas"))
+                except Exception as e:
+                    self._show_error("下载失败", str(e))
+                    continue
+
+                self._ui_q.put((pb.configure, ({'value': len(files)},)))
+                self._ui_q.put((progress_var.set, ("下载完成！",)))
+
+                # 安装指引是模态窗口（grab_set + wait_window），必须在
+                # Tk 主线程里跑；工作线程只等它关掉再继续下一个字体
+                self._run_on_ui(FontDownloader.show_install_instructions, TMP_DIR)
+
+                for f in tmp_files:
+                    entry = {
+                        "filename": f.name,
+                        "source": chosen["repo_key"],
+                        "id": info['meta'].id
+                    }
+                    self.installed[f.name] = entry
+                    self._append_installed_log(log_f, entry)
+                self.root.after(0, self.load_installed_list)
+        finally:
+            self._ui_q.put((win.destroy, ()))
+
+    def _run_on_ui(self, func, *args):
+        """把阻塞型 UI 调用排到 Tk 主线程执行，工作线程等它完成拿返回值。"""
+        fut = Future()
+        def call():
+            try:
+                fut.set_result(func(*args))
+            except Exception as e:
+                fut.set_exception(e)
+        self.root.after(0, call)
+        return fut.result()
 
     def _show_error(self, title, msg):
         self.root.after(0, lambda: messagebox.showerror(title, msg))
@@ -409,6 +1171,12 @@ class FontManagerGUI:
         self.root.after(0, lambda: messagebox.showinfo(title, msg))
 
     def ask_source_choice(self, sources):
+        """工作线程入口：对话框排到 Tk 主线程构建，这里只阻塞等用户的选择。"""
+        fut = Future()
+        self.root.after(0, self._show_source_dialog, sources, fut)
+        return fut.result()
+
+    def _show_source_dialog(self, sources, fut):
         win = Toplevel(self.root)
         win.title("选择来源仓库")
         win.geometry("520x300")
@@ -417,19 +1185,21 @@ class FontManagerGUI:
         lb.pack(fill="both", expand=True, padx=6, pady=6)
         for s in sources:
             lb.insert(END, f"{s['repo_key']}  -> files: {', '.join(s.get('files',[]))}")
-        chosen = {"value": None}
         def on_ok():
             cur = lb.curselection()
             if not cur:
                 messagebox.showwarning("提示", "请选择一个来源")
                 return
-            chosen["value"] = sources[cur[0]]
+            fut.set_result(sources[cur[0]])
             win.destroy()
+        def on_close():
+            # 直接关窗等同放弃，必须兑现 Future，否则工作线程永远等下去
+            fut.set_result(None)
+            win.destroy()
+        win.protocol("WM_DELETE_WINDOW", on_close)
         Button(win, text="确定", command=on_ok).pack(pady=6)
         win.transient(self.root)
         win.grab_set()
-        self.root.wait_window(win)
-        return chosen["value"]
 
     # --- Installed tab --- #
     def setup_installed_tab(self, parent):
@@ -445,26 +1215,30 @@ class FontManagerGUI:
 
     def load_installed_list(self):
         self.installed_listbox.delete(0, END)
-        for k, v in self.installed.items():
+        # 与列表框同步维护有序键表：选中下标到键的映射跟随每次重建，
+        # 不必在每次点击时重新 list() 整个字典，也不依赖点击时的字典顺序
+        self._installed_order = list(self.installed.keys())
+        for k in self._installed_order:
+            v = self.installed[k]
             self.installed_listbox.insert(END, f"{v['filename']}  [{v['source']}]")
 
     def on_uninstall_selected(self):
         sel = self.installed_listbox.curselection()
         if not sel:
             return
-        keys = list(self.installed.keys())
-        filenames = [self.installed[keys[i]]["filename"] for i in sel]
+        order = self._installed_order
+        filenames = [self.installed[order[i]]["filename"] for i in sel]
         FontDownloader.show_uninstall_instructions(filenames, gui_ref=self)
 
     # --- Refresh index in thread --- #
     def refresh_index_threaded(self):
-        t = threading.Thread(target=self._refresh_index, daemon=True)
-        t.start()
+        _BG_POOL.submit(self._refresh_index)
 
     def _refresh_index(self):
         self._show_info("索引刷新", "正在刷新字体索引，请稍候...")
         self.indexer.refresh_all()
-        self.refresh_fonts_view()
+        # 列表重绘要动 Treeview，排回 Tk 主线程执行
+        self.root.after(0, self.refresh_fonts_view)
         self._show_info("完成", "字体索引刷新完成")
 
 # —— 程序入口 —— #
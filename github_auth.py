@@ -1,27 +1,115 @@
 import os
+import atexit
+import hashlib
+import hmac
+import time
 import keyring
 import requests
 import json
 import secrets
-import webview
-import tkinter as tk
-from tkinter import ttk, messagebox
 from pathlib import Path
+import re
+import socket
 import threading
-import webbrowser
-from urllib.parse import parse_qs, urlparse
-import pyperclip
-from http.server import HTTPServer, BaseHTTPRequestHandler
-
-class OAuthCallbackHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        
-        query_components = parse_qs(urlparse(self.path).query)
-        
-        success_html = '''
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
+
+# orjson 的 C 解析/序列化比 stdlib 快 3-10 倍，装不上时退回 stdlib，行为一致
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=4).encode('utf-8')
+
+# 全局复用的 HTTP 会话：keep-alive 复用 TCP/TLS 连接，避免每次请求重新握手。
+# 池子开大一些，并发下载描述文件/字体时不至于互相挤占连接。
+# 对幂等请求自动重试瞬时 5xx（指数退避），POST 不在重试范围内。
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16, pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[502, 503, 504])))
+# GitHub 会限流没有 User-Agent 的客户端
+_SESSION.headers['User-Agent'] = 'Font-Download-Manager'
+# (连接, 读取) 超时，挂死的连接不会永远占着调用方
+_TIMEOUT = (3, 10)
+
+# 客户端侧速率配额跟踪：从每个响应里读 X-RateLimit-* 头，快见底时主动等到重置点，
+# 而不是批量下载到一半吃 403 硬停
+_RATE_LOCK = threading.Lock()
+_rl_remaining = 5000
+_rl_reset = 0.0
+
+def _track_rate(response):
+    global _rl_remaining, _rl_reset
+    try:
+        remaining = int(response.headers.get('X-RateLimit-Remaining', ''))
+        reset = float(response.headers.get('X-RateLimit-Reset', ''))
+    except ValueError:
+        return
+    with _RATE_LOCK:
+        _rl_remaining, _rl_reset = remaining, reset
+
+def _wait_for_quota(threshold=10):
+    with _RATE_LOCK:
+        remaining, reset = _rl_remaining, _rl_reset
+    if remaining < threshold:
+        delay = reset - time.time() + 1
+        if delay > 0:
+            print(f"[warn] GitHub API 配额仅剩 {remaining}，等待 {delay:.0f} 秒后继续")
+            time.sleep(delay)
+
+# 按 URL 记录 ETag 的小缓存：重复请求同一资源时先发条件请求，命中 304 免传正文
+_HTTP_CACHE_PATH = Path(__file__).parent / "data" / "http_cache.json"
+_HTTP_CACHE_LOCK = threading.Lock()
+_http_cache = None
+_http_cache_dirty = False
+
+def _load_http_cache():
+    global _http_cache
+    if _http_cache is None:
+        with _HTTP_CACHE_LOCK:
+            if _http_cache is None:
+                try:
+                    _http_cache = _loads(_HTTP_CACHE_PATH.read_bytes())
+                except (OSError, ValueError):
+                    _http_cache = {}
+    return _http_cache
+
+def _store_etag(url, etag):
+    _load_http_cache()[url] = etag
+    global _http_cache_dirty
+    _http_cache_dirty = True
+
+def _save_http_cache():
+    global _http_cache_dirty
+    with _HTTP_CACHE_LOCK:
+        if not _http_cache_dirty:
+            return
+        _HTTP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _HTTP_CACHE_PATH.with_suffix('.json.tmp')
+        tmp.write_bytes(_dumps(_http_cache))
+        os.replace(tmp, _HTTP_CACHE_PATH)
+        _http_cache_dirty = False
+
+# 进程退出时统一落盘一次，平时只改内存，避免每个新 ETag 都写文件
+atexit.register(_save_http_cache)
+
+# 批量下载共用的线程池：线程跨调用复用，并发上限 10 与速率限制相称
+_DL_POOL = ThreadPoolExecutor(max_workers=10, thread_name_prefix="gh-dl")
+
+# 回调页面在导入时编码好一次，处理请求时只剩指针拷贝
+_SUCCESS_HTML = ('''
         <!DOCTYPE html>
         <html>
         <head>
@@ -61,9 +149,9 @@ class OAuthCallbackHandler(BaseHTTPRequestHandler):
             </script>
         </body>
         </html>
-        '''
-        
-        error_html = '''
+        ''').encode('utf-8')
+
+_ERROR_HTML = ('''
         <!DOCTYPE html>
         <html>
         <head>
@@ -98,24 +186,48 @@ class OAuthCallbackHandler(BaseHTTPRequestHandler):
             </div>
         </body>
         </html>
-        '''
-        
-        response_html = success_html if 'code' in query_components else error_html
-        self.wfile.write(response_html.encode('utf-8'))
-        
-        if 'code' in query_components:
-            self.server.oauth_code = query_components['code'][0]
-            self.server.oauth_state = query_components.get('state', [None])[0]
+        ''').encode('utf-8')
 
 class GitHubManager:
+    # 进程级共享实例：GitHubAuth 的令牌/配置缓存只建一份，热路径免去重复构造
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         self.github_auth = GitHubAuth()
-        
-    def download_file(self, owner, repo, file_path, save_path):
+
+    def download_file(self, owner, repo, file_path, save_path, token=None):
         """
         下载 GitHub 仓库文件（支持私有仓库），封装 GitHubAuth 的下载接口。
+        返回 True 表示拉到了新正文，False 表示 304、本地副本仍是最新。
+        """
+        return self.github_auth.download_file(owner, repo, file_path, save_path,
+                                              token=token)
+
+    def download_files(self, owner, repo, paths, save_dir, token=None):
+        """
+        批量下载同一仓库的多个文件，封装 GitHubAuth 的树查询 + 并发下载。
+        """
+        return self.github_auth.download_files(owner, repo, paths, save_dir,
+                                               token=token)
+
+    def download_file_conditional(self, owner, repo, file_path, save_path,
+                                  etag=None, last_modified=None, token=None):
+        """
+        条件下载（ETag / Last-Modified），封装 GitHubAuth 的条件下载接口。
+        正文变化时同时以 bytes 返回，调用方可直接在内存里解析。
         """
-        return self.github_auth.download_file(owner, repo, file_path, save_path)
+        return self.github_auth.download_file_conditional(
+            owner, repo, file_path, save_path,
+            etag=etag, last_modified=last_modified, token=token)
 
     # —— 在 GitHubManager 中新增下载方法 —— #
     # 假设你的 github_auth.GitHubManager 已有 session（requests.Session）
@@ -206,11 +318,32 @@ class GitHubManager:
 
     def setup_github_app(self):
         """使用tkinter引导用户设置GitHub OAuth应用"""
+        # tkinter/pyperclip/webbrowser 只有走到设置向导才需要，
+        # 顶层导入会白白拖慢纯命令行路径的启动
+        import tkinter as tk
+        from tkinter import ttk, messagebox
+        import pyperclip
+        import webbrowser
+
         class SetupWindow(tk.Toplevel):
-            def __init__(self):
-                super().__init__()
+            def __init__(self, master):
+                super().__init__(master)
                 self.credentials = None
+                self.done_var = tk.IntVar(master=master)
                 self.setup_ui()
+                # 点 X 取消与保存走同一条收尾路径，凭据保持 None
+                self.protocol("WM_DELETE_WINDOW", self.close)
+
+            def close(self):
+                self.credentials = None
+                self.done_var.set(self.done_var.get() + 1)
+
+            def reset(self):
+                """复用窗口时清空上次的输入再显示。"""
+                self.credentials = None
+                self.client_id.delete(0, 'end')
+                self.client_secret.delete(0, 'end')
+                self.deiconify()
                 
             def setup_ui(self):
                 self.title("GitHub应用设置指南")
@@ -336,15 +469,22 @@ class GitHubManager:
                     return
                     
                 self.credentials = (client_id, client_secret)
-                self.destroy()
-        
-        root = tk.Tk()
-        root.withdraw()
-        setup_window = SetupWindow()
-        
-        root.wait_window(setup_window)
-        root.destroy()
-        
+                self.done_var.set(self.done_var.get() + 1)
+
+        # Tk 根窗口和整套向导控件只建一次，之后的调用清空输入直接复用，
+        # 也避免每次新建 Tk 解释器又不销毁造成的资源堆积
+        if getattr(self, '_setup_window', None) is None:
+            self._tk_root = tk.Tk()
+            self._tk_root.withdraw()
+            self._setup_window = SetupWindow(self._tk_root)
+        else:
+            self._setup_window.reset()
+        setup_window = self._setup_window
+
+        # 等"保存"或"关闭"把 done_var 加一，而不是等窗口销毁
+        self._tk_root.wait_variable(setup_window.done_var)
+        setup_window.withdraw()
+
         if setup_window.credentials:
             self.github_auth.CLIENT_ID = setup_window.credentials[0]
             self.github_auth.CLIENT_SECRET = setup_window.credentials[1]
@@ -353,6 +493,9 @@ class GitHubManager:
         return False
 
     def _get_github_token(self):
+        # webview 连带加载系统浏览器内核，推迟到真正发起 OAuth 登录时再导入
+        import webview
+
         state = secrets.token_hex(16)
         auth_url = (
             f"https://github.com/login/oauth/authorize"
@@ -364,28 +507,43 @@ class GitHubManager:
         
         auth_complete = threading.Event()
         server_error = None
-        auth_data = {'code': None, 'state': None}
-        
+        auth_data = {'result': None}
+
         def run_server():
+            # 一次性裸 socket 监听：整个流程只预期一个回调请求，
+            # 用不上 HTTPServer 的解析、日志和分发机器
             try:
-                server = HTTPServer(('localhost', 9826), OAuthCallbackHandler)
-                server.oauth_code = None
-                server.oauth_state = None
-                server.timeout = 1
-                
-                while not auth_complete.is_set():
-                    server.handle_request()
-                    if server.oauth_code and server.oauth_state:
-                        auth_data['code'] = server.oauth_code
-                        auth_data['state'] = server.oauth_state
-                        auth_complete.set()
-                        
+                with socket.create_server(('localhost', 9826)) as srv:
+                    # 1 秒短超时轮询退出标志：流程被放弃时主线程 finally 里
+                    # 置位 auth_complete，这里至多 1 秒就退出并释放端口，
+                    # 马上重试登录不会再撞上 Address already in use
+                    srv.settimeout(1)
+                    while not auth_complete.is_set():
+                        try:
+                            conn, _ = srv.accept()
+                        except socket.timeout:
+                            continue
+                        with conn:
+                            data = conn.recv(4096)
+                            m = re.search(rb'GET /callback\?([^ ]+) ', data)
+                            qs = parse_qs(m.group(1).decode()) if m else {}
+                            body = _SUCCESS_HTML if 'code' in qs else _ERROR_HTML
+                            conn.sendall(
+                                b'HTTP/1.1 200 OK\r\n'
+                                b'Content-Type: text/html; charset=utf-8\r\n'
+                                b'Content-Length: ' + str(len(body)).encode() +
+                                b'\r\nConnection: close\r\n\r\n' + body)
+                        if 'code' in qs:
+                            # 单次元组赋值，主线程读到的要么是 None 要么是完整结果
+                            auth_data['result'] = (qs['code'][0],
+                                                   qs.get('state', [None])[0])
+                            break
+                        # 浏览器可能先来 favicon 之类的请求，继续等真正的回调
             except Exception as e:
                 nonlocal server_error
                 server_error = str(e)
-                auth_complete.set()
             finally:
-                server.server_close()
+                auth_complete.set()
         
         server_thread = threading.Thread(target=run_server)
         server_thread.daemon = True
@@ -393,30 +551,34 @@ class GitHubManager:
         
         try:
             window = webview.create_window('GitHub登录', auth_url, width=800, height=600)
-            webview.start(func=lambda: auth_complete.wait())
+            # 真正的超时兜底放在这里：5 分钟没等到回调就放弃
+            webview.start(func=lambda: auth_complete.wait(timeout=300))
             
             if server_error:
                 raise ValueError(f"服务器错误: {server_error}")
             
-            if not auth_data['code'] or auth_data['state'] != state:
+            code, cb_state = auth_data['result'] or (None, None)
+            # 常数时间比较 state，校验失败和缺失走同一条出错路径
+            if not code or not hmac.compare_digest(cb_state or '', state):
                 raise ValueError("GitHub授权失败或已取消")
             
-            response = requests.post(
+            response = _SESSION.post(
                 'https://github.com/login/oauth/access_token',
                 data={
                     'client_id': self.github_auth.CLIENT_ID,
                     'client_secret': self.github_auth.CLIENT_SECRET,
-                    'code': auth_data['code'],
+                    'code': code,
                     'redirect_uri': 'http://localhost:9826/callback',
                     'state': state
                 },
-                headers={'Accept': 'application/json'}
+                headers={'Accept': 'application/json'},
+                timeout=_TIMEOUT
             )
             
             if response.status_code != 200:
                 raise ValueError("获取访问令牌失败")
             
-            token_data = response.json()
+            token_data = _loads(response.content)
             if 'access_token' not in token_data:
                 raise ValueError("未收到访问令牌")
             
@@ -433,10 +595,16 @@ class GitHubAuth:
     def __init__(self):
         self.SERVICE_NAME = "FontManagerGitHub"
         self.USERNAME = "default"
+        self._cached_token = None
+        self._token_loaded = False
+        self._last_verified_ts = 0.0
         self.config_path = Path(__file__).parent / "data" / "account.conf"
         self.ensure_config_file()
         self.load_config()
         
+    # 解析结果按 mtime_ns 缓存：反复实例化 GitHubAuth 时文件没动就不重读重解析
+    _config_cache = (None, None)
+
     def ensure_config_file(self):
         """确保配置文件存在且格式正确"""
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
@@ -450,26 +618,45 @@ class GitHubAuth:
                 "token_url": "https://github.com/login/oauth/access_token"
             }
         }
-        
+
+        try:
+            mtime = self.config_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        cached_mtime, cached_config = GitHubAuth._config_cache
+        if mtime is not None and mtime == cached_mtime:
+            self.config = cached_config
+            self._loaded_config = _loads(_dumps(cached_config))
+            return
+
         needs_default = True
-        if self.config_path.exists():
+        if mtime is not None:
             try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                if (isinstance(config, dict) and 
-                    'github' in config and 
+                config = _loads(self.config_path.read_bytes())
+                if (isinstance(config, dict) and
+                    'github' in config and
                     isinstance(config['github'], dict) and
                     all(key in config['github'] for key in self.default_config['github'])):
                     needs_default = False
             except:
                 pass
-                
+
         if needs_default:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.default_config, f, indent=4)
+            self._write_config(self.default_config)
             self.config = self.default_config
         else:
             self.config = config
+        self._loaded_config = _loads(_dumps(self.config))
+        try:
+            GitHubAuth._config_cache = (self.config_path.stat().st_mtime_ns, self.config)
+        except OSError:
+            pass
+
+    def _write_config(self, config):
+        # 先写临时文件再 os.replace，中途崩溃不会留下半截配置
+        tmp = self.config_path.with_suffix('.conf.tmp')
+        tmp.write_bytes(_dumps(config))
+        os.replace(tmp, self.config_path)
     
     def load_config(self):
         self.CLIENT_ID = self.config.get('github', {}).get('client_id', '')
@@ -479,41 +666,210 @@ class GitHubAuth:
     def save_config(self):
         self.config['github']['client_id'] = self.CLIENT_ID
         self.config['github']['client_secret'] = self.CLIENT_SECRET
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, indent=4)
+        # 内容没变就不写盘，菜单循环里反复保存不再有冗余 IO
+        if self.config == self._loaded_config:
+            return
+        self._write_config(self.config)
+        self._loaded_config = _loads(_dumps(self.config))
+        try:
+            GitHubAuth._config_cache = (self.config_path.stat().st_mtime_ns, self.config)
+        except OSError:
+            pass
 
     def get_stored_token(self):
-        return keyring.get_password(self.SERVICE_NAME, self.USERNAME)
-    
+        # keyring 在 Windows 上走 DPAPI/COM、macOS 上走 Keychain IPC，
+        # 每次读都是毫秒级；进程内只读一次，之后直接用缓存
+        if not self._token_loaded:
+            self._cached_token = keyring.get_password(self.SERVICE_NAME, self.USERNAME)
+            self._token_loaded = True
+        return self._cached_token
+
     def store_token(self, token):
         keyring.set_password(self.SERVICE_NAME, self.USERNAME, token)
+        self._cached_token = token
+        self._token_loaded = True
     
+    # 验证结果的进程内缓存：键是令牌哈希前缀，短时间内反复进菜单不重复打 /user
+    _VERIFY_TTL = 60.0
+    _verify_cache = {}
+
     def verify_token(self, token):
+        now = time.monotonic()
+        # 10 分钟信任窗口：当前令牌刚验证过就直接认，重启后首次验证照常走网络；
+        # 下载路径遇到 401 会把窗口清零强制重验
+        if token and token == self._cached_token and now - self._last_verified_ts < 600:
+            return True
+        key = hashlib.sha256(token.encode()).hexdigest()[:16]
+        cached = self._verify_cache.get(key)
+        if cached and now < cached[1]:
+            return cached[0]
         headers = {
             'Authorization': f'token {token}',
             'Accept': 'application/vnd.github.v3+json'
         }
-        response = requests.get('https://api.github.com/user', headers=headers)
-        return response.status_code == 200
+        # 带上 /user 的 ETag：令牌没变时 GitHub 回 304，不计入速率配额
+        etag_key = f'https://api.github.com/user#{key}'
+        etag = _load_http_cache().get(etag_key)
+        if etag:
+            headers['If-None-Match'] = etag
+        _wait_for_quota()
+        response = _SESSION.get('https://api.github.com/user', headers=headers,
+                                timeout=_TIMEOUT)
+        _track_rate(response)
+        ok = response.status_code in (200, 304)
+        if ok and response.headers.get('ETag'):
+            _store_etag(etag_key, response.headers['ETag'])
+        self._verify_cache[key] = (ok, now + self._VERIFY_TTL)
+        if ok and token == self._cached_token:
+            self._last_verified_ts = now
+        return ok
 
-    def download_file(self, repo_owner, repo_name, file_path, save_path):
-        token = self.get_stored_token()
+    def download_file(self, repo_owner, repo_name, file_path, save_path, token=None):
+        """返回 True 表示写入了新正文；命中 304（本地副本仍新鲜）返回 False。"""
+        # 允许调用方传入已取好的令牌，批量下载时省掉每个文件一次 keyring 往返
+        token = token or self.get_stored_token()
         if not token:
             raise ValueError("未登录GitHub账户")
             
         headers = {
             'Authorization': f'token {token}',
             'Accept': 'application/vnd.github.v3.raw'
+            # Accept-Encoding 交给 requests：只宣告本地真解得开的算法，
+            # 手写 br 而没装解码器的话，压缩字节会原样落盘
         }
-        
+
         url = f'https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}'
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            with open(save_path, 'wb') as f:
-                f.write(response.content)
+        # 本地副本还在时带上 If-None-Match，服务端内容没变就只回 304 不传正文
+        cache = _load_http_cache()
+        cached_etag = cache.get(url)
+        if cached_etag and os.path.exists(save_path):
+            headers['If-None-Match'] = cached_etag
+        # 流式落盘：峰值内存只有一个分块的大小，而不是整个字体文件
+        _wait_for_quota()
+        with _SESSION.get(url, headers=headers, stream=True,
+                          timeout=_TIMEOUT) as response:
+            _track_rate(response)
+            if response.status_code == 304:
+                return False
+            if response.status_code != 200:
+                if response.status_code == 401:
+                    self._last_verified_ts = 0.0  # 令牌失效，作废信任窗口
+                raise Exception(f"下载失败: {response.json().get('message', '未知错误')}")
+            # iter_content 自带传输层解码，比直接搬 response.raw 稳妥。
+            # 先写 .part 再 os.replace：save_path 可能与 blob 缓存/已安装字体
+            # 共享硬链接 inode，原地 open('wb') 截断会把它们一并改写；
+            # replace 换上全新 inode，半截下载也不会留下残缺的目标文件
+            part_path = f"{save_path}.part"
+            try:
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(65536):
+                        f.write(chunk)
+            except Exception:
+                try:
+                    os.remove(part_path)
+                except OSError:
+                    pass
+                raise
+            os.replace(part_path, save_path)
+            etag = response.headers.get('ETag')
+            if etag:
+                _store_etag(url, etag)
             return True
-        else:
+
+    def download_files(self, repo_owner, repo_name, paths, save_dir, token=None):
+        """
+        批量下载同一仓库的多个文件：先用一次 git/trees?recursive=1 拿到
+        path -> blob SHA 映射，再按 SHA 并发拉取正文。相比逐个 contents
+        调用，N 个文件的元数据查询从 N 次并为 1 次，正文下载并行进行。
+        返回 list[Path]，顺序与 paths 一致。
+        """
+        token = token or self.get_stored_token()
+        if not token:
+            raise ValueError("未登录GitHub账户")
+        headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+        base = f'https://api.github.com/repos/{repo_owner}/{repo_name}'
+        _wait_for_quota()
+        resp = _SESSION.get(f'{base}/git/trees/HEAD',
+                            params={'recursive': '1'}, headers=headers,
+                            timeout=_TIMEOUT)
+        _track_rate(resp)
+        tree_data = _loads(resp.content)
+        if resp.status_code != 200:
+            raise Exception(f"获取文件树失败: {tree_data.get('message', '未知错误')}")
+        sha_by_path = {e['path']: e['sha']
+                       for e in tree_data.get('tree', [])
+                       if e.get('type') == 'blob'}
+        save_dir = Path(save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        raw_headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.raw'
+        }
+
+        def fetch(file_path):
+            sha = sha_by_path.get(file_path)
+            if sha is None:
+                raise Exception(f"仓库中不存在文件: {file_path}")
+            save_path = save_dir / Path(file_path).name
+            _wait_for_quota()
+            with _SESSION.get(f'{base}/git/blobs/{sha}',
+                              headers=raw_headers, stream=True,
+                              timeout=_TIMEOUT) as r:
+                _track_rate(r)
+                if r.status_code != 200:
+                    raise Exception(f"下载失败: {file_path}")
+                with open(save_path, 'wb') as f:
+                    for chunk in r.iter_content(65536):
+                        f.write(chunk)
+            return save_path
+
+        return list(_DL_POOL.map(fetch, paths))
+
+    def download_file_conditional(self, repo_owner, repo_name, file_path, save_path,
+                                  etag=None, last_modified=None, token=None):
+        """
+        带条件请求的下载：携带 If-None-Match / If-Modified-Since，
+        命中 304 时不传输正文、不重写本地文件。
+        流式写盘并顺带计算 sha256，调用方可用它判断内容是否真的变了。
+        返回 (changed, etag, last_modified, sha256, body)；正文同时以 bytes
+        交还调用方，省得刚写完盘又读回去解析；304 时 sha256/body 为 None。
+        """
+        token = token or self.get_stored_token()
+        if not token:
+            raise ValueError("未登录GitHub账户")
+
+        headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3.raw'
+        }
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        url = f'https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}'
+        _wait_for_quota()
+        with _SESSION.get(url, headers=headers, stream=True,
+                          timeout=_TIMEOUT) as response:
+            _track_rate(response)
+            if response.status_code == 304:
+                return False, etag, last_modified, None, None
+            if response.status_code == 200:
+                h = hashlib.sha256()
+                chunks = []
+                with open(save_path, 'wb') as f:
+                    for chunk in response.iter_content(65536):
+                        h.update(chunk)
+                        f.write(chunk)
+                        chunks.append(chunk)
+                return (True, response.headers.get('ETag'),
+                        response.headers.get('Last-Modified'), h.hexdigest(),
+                        b"".join(chunks))
+            if response.status_code == 401:
+                self._last_verified_ts = 0.0  # 令牌失效，作废信任窗口
             raise Exception(f"下载失败: {response.json().get('message', '未知错误')}")
 
 if __name__ == "__main__":
@@ -1,13 +1,25 @@
-import os
-from github_auth import GitHubManager
-from font_manager import run_gui
 import time
-import ctypes
-from colorama import Fore, Back, Style, init
 import sys
+from colorama import Fore, Back, Style, init
+
+# github_auth（requests/keyring）和 font_manager（Tkinter）都很重，
+# 推迟到对应菜单分支里再导入，启动到首个提示符不用付这笔导入开销
+
+# ANSI 清屏序列：colorama.init() 后在 Windows 控制台同样生效，
+# 比 os.system('cls') 省掉每次刷菜单都 fork 一个 cmd.exe
+CLEAR = "\x1b[2J\x1b[H"
+
+def clear_screen():
+    sys.stdout.write(CLEAR)
+    sys.stdout.flush()
 
 # 检查当前程序是否拥有管理员权限，如果没有则尝试申请
 def run_as_admin():
+    if sys.platform != 'win32':
+        # 非 Windows（开发机）上没有 UAC，也 import 不了 windll
+        return True
+    import ctypes
+
     print("管理员权限核验", end=' ')
     print("....................................................", end=' ')
     time.sleep(0.2)
@@ -36,29 +48,28 @@ def run_as_admin():
 
 
 class FontManager:
-    def __init__(self):
-        self.github_manager = GitHubManager()
-    
     def show_menu(self):
         while True:
-            os.system('cls')
+            clear_screen()
             print("\n=== 字体管理器 ===")
             print("1. GitHub账户管理")
             print("2. 字体管理")
             print("0. 退出程序")
-            
+
             choice = input("\n请输入选项（0-2）：")
-            
+
             if choice == "1":
-                os.system('cls')
-                self.github_manager.show_menu()
+                clear_screen()
+                from github_auth import GitHubManager
+                GitHubManager.instance().show_menu()
 
             elif choice == "2":
-                os.system('cls')
+                clear_screen()
+                from font_manager import run_gui
                 run_gui()
 
             elif choice == "0":
-                os.system('cls')
+                clear_screen()
                 print("感谢使用，再见！")
                 time.sleep(0.5)
                 break
@@ -67,6 +78,7 @@ class FontManager:
                 print("无效的选项，请重新输入！")
 
 def main():
+    init()  # 让 Windows 控制台接受 ANSI 转义（颜色与清屏）
     run_as_admin()
     font_manager = FontManager()
     font_manager.show_menu()